@@ -3,27 +3,92 @@ Script para enviar datos del Arduino a Flespi vía MQTT
 Captura imágenes cada 15 segundos y detecta anomalías (humo)
 """
 
-import serial
-import serial.tools.list_ports
 import time
+import itertools
 import json
+import base64
+import queue
+import threading
+import zlib
 import random
 from datetime import datetime
+import numpy as np
 import paho.mqtt.client as mqtt
 
-class ArduinoFlespiMQTT:
-    def __init__(self, flespi_token, baudrate=115200):
+from serial_io import SerialIO, CSV_INICIO, CSV_FIN
+
+# Tamaño máximo de frame esperado (QVGA) para el buffer preasignado
+_MAX_PIXELS = 320 * 240
+
+# Serializador JSON: orjson (implementado en C, ~5-10x más rápido) cuando
+# está instalado, stdlib como respaldo. Ambos devuelven bytes, que paho
+# acepta directamente en publish().
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+
+# Kernel de estadísticas: con Numba disponible se compila una sola pasada
+# (min/máx/suma en registros) sobre el frame; sin Numba se usan las
+# reducciones de NumPy, que ya corren en C.
+try:
+    from numba import njit
+
+    @njit(cache=True, fastmath=True)
+    def _stats_kernel(arr):
+        mn = arr[0]
+        mx = arr[0]
+        s = 0
+        for v in arr:
+            if v < mn:
+                mn = v
+            if v > mx:
+                mx = v
+            s += v
+        return mn, mx, s
+
+except ImportError:
+    def _stats_kernel(arr):
+        return arr.min(), arr.max(), int(arr.sum())
+
+class ArduinoFlespiMQTT(SerialIO):
+    def __init__(self, flespi_token, baudrate=115200, batch_size=1, pool_size=1):
         """
         Inicializa el enviador de datos a Flespi vía MQTT
-        
+
         Args:
             flespi_token: Tu token de Flespi
             baudrate: Velocidad del serial (default 115200)
+            batch_size: Capturas a agrupar por publicación MQTT (default 1).
+                        Con valores >1 se amortiza el round-trip del PUBACK;
+                        las anomalías fuerzan el envío inmediato del lote.
+            pool_size: Clientes MQTT en paralelo (default 1). Cada cliente
+                       serializa sobre su propio socket, así que con
+                       intervalos cortos varios clientes reparten la carga.
+                       Las anomalías siempre salen por el primer cliente
+                       para conservar su orden.
         """
-        self.baudrate = baudrate
-        self.serial_port = None
-        self.is_connected_arduino = False
+        super().__init__(baudrate)
         self.is_connected_mqtt = False
+        self._mqtt_ready = threading.Event()
+
+        # Lote de payloads pendientes de publicar
+        self.batch_size = max(1, batch_size)
+        self._pending = []
+
+        # Cola de transmisión: la captura encola y un hilo aparte publica,
+        # así la latencia del broker no frena la siguiente lectura serial
+        self._tx_q = queue.Queue(maxsize=32)
+        threading.Thread(target=self._publisher, daemon=True).start()
+
+        # Buffer de frame reutilizado entre capturas (el de lectura serial
+        # vive en SerialIO)
+        self._frame = np.empty(_MAX_PIXELS, dtype=np.uint8)
         
         # Configuración MQTT Flespi
         self.flespi_token = flespi_token
@@ -31,17 +96,34 @@ class ArduinoFlespiMQTT:
         self.mqtt_port = 1883  # Puerto sin SSL, usar 8883 para SSL
         self.mqtt_topic = "arduino/anomalias"  # Puedes cambiarlo
         
-        # Cliente MQTT
-        self.mqtt_client = mqtt.Client(
-            client_id=f"arduino-detector-{int(time.time())}",
-            protocol=mqtt.MQTTv5
-        )
-        self.mqtt_client.username_pw_set(f"FlespiToken {flespi_token}", "")
-        
-        # Callbacks MQTT
-        self.mqtt_client.on_connect = self.on_mqtt_connect
-        self.mqtt_client.on_disconnect = self.on_mqtt_disconnect
-        self.mqtt_client.on_publish = self.on_mqtt_publish
+        # Pool de clientes MQTT (round-robin para repartir publicaciones).
+        # client_id estable para que el broker conserve la sesión entre
+        # reconexiones (se conecta con clean_start=False).
+        self.pool_size = max(1, pool_size)
+        self.mqtt_clients = []
+        for i in range(self.pool_size):
+            cliente = mqtt.Client(
+                mqtt.CallbackAPIVersion.VERSION2,
+                client_id=f"arduino-detector-{i}",
+                protocol=mqtt.MQTTv5
+            )
+            cliente.username_pw_set(f"FlespiToken {flespi_token}", "")
+
+            # Más mensajes en vuelo/encolados: el default de paho (20/65535)
+            # limita el throughput con QoS 1
+            cliente.max_inflight_messages_set(100)
+            cliente.max_queued_messages_set(1000)
+
+            # Callbacks MQTT
+            cliente.on_connect = self.on_mqtt_connect
+            cliente.on_disconnect = self.on_mqtt_disconnect
+            cliente.on_publish = self.on_mqtt_publish
+
+            self.mqtt_clients.append(cliente)
+
+        # El primer cliente queda reservado para anomalías (orden garantizado)
+        self.mqtt_client = self.mqtt_clients[0]
+        self._rr = itertools.cycle(self.mqtt_clients)
         
         # Estadísticas
         self.total_envios = 0
@@ -49,38 +131,41 @@ class ArduinoFlespiMQTT:
         self.envios_normal = 0
         self.errores = 0
     
-    def on_mqtt_connect(self, client, userdata, flags, rc, properties=None):
+    def on_mqtt_connect(self, client, userdata, flags, reason_code, properties):
         """Callback cuando se conecta a MQTT"""
-        if rc == 0:
+        if not reason_code.is_failure:
             print("✅ Conectado a Flespi MQTT!")
             self.is_connected_mqtt = True
+            self._mqtt_ready.set()
         else:
-            print(f"❌ Error de conexión MQTT. Código: {rc}")
+            print(f"❌ Error de conexión MQTT. Código: {reason_code}")
             self.is_connected_mqtt = False
-    
-    def on_mqtt_disconnect(self, client, userdata, rc, properties=None):
+
+    def on_mqtt_disconnect(self, client, userdata, disconnect_flags, reason_code, properties):
         """Callback cuando se desconecta de MQTT"""
         print("⚠️  Desconectado de MQTT")
         self.is_connected_mqtt = False
-    
-    def on_mqtt_publish(self, client, userdata, mid):
+        self._mqtt_ready.clear()
+
+    def on_mqtt_publish(self, client, userdata, mid, reason_code, properties):
         """Callback cuando se publica un mensaje"""
         pass  # Silencioso para no saturar la consola
     
     def conectar_mqtt(self):
-        """Conecta al broker MQTT de Flespi"""
+        """Conecta el pool de clientes al broker MQTT de Flespi"""
         print(f"\n🔌 Conectando a Flespi MQTT ({self.mqtt_host})...")
-        
+
         try:
-            self.mqtt_client.connect(self.mqtt_host, self.mqtt_port, keepalive=60)
-            self.mqtt_client.loop_start()
+            for cliente in self.mqtt_clients:
+                # clean_start=False: el broker mantiene la sesión y no hay
+                # que reconstruir estado en cada reconexión
+                cliente.connect(self.mqtt_host, self.mqtt_port, keepalive=60,
+                                clean_start=False)
+                cliente.loop_start()
             
-            # Esperar conexión
-            timeout = time.time() + 5
-            while not self.is_connected_mqtt and time.time() < timeout:
-                time.sleep(0.1)
-            
-            if self.is_connected_mqtt:
+            # Esperar conexión: el Event se dispara desde on_mqtt_connect,
+            # sin dormir en un bucle de sondeo
+            if self._mqtt_ready.wait(timeout=5):
                 print(f"✅ MQTT conectado! Topic: {self.mqtt_topic}")
                 return True
             else:
@@ -91,110 +176,40 @@ class ArduinoFlespiMQTT:
             print(f"❌ Error conectando MQTT: {e}")
             return False
     
-    def listar_puertos(self):
-        """Lista todos los puertos seriales disponibles"""
-        puertos = serial.tools.list_ports.comports()
-        print("\n" + "="*60)
-        print("PUERTOS SERIALES DISPONIBLES:")
-        print("="*60)
-        
-        if not puertos:
-            print("❌ No se encontraron puertos seriales")
-            return []
-        
-        for i, puerto in enumerate(puertos, 1):
-            print(f"{i}. {puerto.device} - {puerto.description}")
-        
-        return puertos
-    
     def conectar_arduino(self, puerto=None):
-        """Conecta al Arduino"""
-        if puerto is None:
-            puertos = self.listar_puertos()
-            if not puertos:
-                return False
-            
-            try:
-                seleccion = int(input("\nSelecciona el número de puerto: ")) - 1
-                puerto = puertos[seleccion].device
-            except (ValueError, IndexError):
-                print("❌ Selección inválida")
-                return False
-        
-        try:
-            print(f"\n🔌 Conectando a Arduino ({puerto})...")
-            self.serial_port = serial.Serial(puerto, self.baudrate, timeout=1)
-            time.sleep(2)
-            self.is_connected_arduino = True
-            print("✅ Arduino conectado!")
-            return True
-        except serial.SerialException as e:
-            print(f"❌ Error al conectar: {e}")
-            return False
-    
-    def leer_linea(self):
-        """Lee una línea del serial"""
-        if not self.is_connected_arduino:
-            return None
-        
-        try:
-            if self.serial_port.in_waiting > 0:
-                linea = self.serial_port.readline().decode('utf-8', errors='ignore').strip()
-                return linea
-        except Exception as e:
-            print(f"⚠️  Error al leer: {e}")
-        
-        return None
-    
-    def enviar_comando(self, comando):
-        """Envía un comando al Arduino"""
-        if not self.is_connected_arduino:
-            return False
-        
-        try:
-            self.serial_port.write(f"{comando}\n".encode())
-            return True
-        except Exception as e:
-            print(f"❌ Error al enviar comando: {e}")
-            return False
-    
+        """Conecta al Arduino (ver SerialIO.conectar)"""
+        return self.conectar(puerto)
+
     def capturar_datos_csv(self):
         """Captura datos CSV de la imagen del Arduino"""
         print("\n📸 Capturando imagen del Arduino...")
         
-        # Limpiar buffer serial
-        while self.serial_port.in_waiting > 0:
-            self.serial_port.read()
-        
+        # Limpiar el buffer del SO en un solo syscall (nada de read() por byte)
+        self.serial_port.reset_input_buffer()
+
         # Enviar comando para captura ML
         if not self.enviar_comando('3'):
             return None
-        
-        time.sleep(0.5)
-        
-        datos_csv = []
-        capturando = False
-        timeout = time.time() + 10
-        
-        while time.time() < timeout:
-            linea = self.leer_linea()
-            
-            if linea:
-                # Detectar inicio de datos CSV
-                if "INICIO DATOS CSV" in linea or "===" in linea:
-                    capturando = True
-                    continue
-                
-                # Detectar fin de datos CSV
-                if "FIN DATOS CSV" in linea or "Copia estos datos" in linea:
-                    break
-                
-                # Capturar líneas con datos
-                if capturando and ',' in linea and not linea.startswith('#'):
-                    datos_csv.append(linea)
-            
-            time.sleep(0.01)
-        
+
+        # Lectura en bloque hasta el centinela de fin (ver SerialIO.read_until)
+        buf = self.read_until(CSV_FIN)
+
+        # Recortar el bloque CSV con los centinelas precompilados, sin
+        # escanear cada línea seis veces en Python
+        m_inicio = CSV_INICIO.search(buf)
+        if m_inicio is None:
+            print("❌ No se capturaron datos")
+            return None
+
+        m_fin = CSV_FIN.search(buf, m_inicio.end())
+        blob = buf[m_inicio.end():m_fin.start() if m_fin else len(buf)]
+
+        # Solo las líneas de datos (con comas y sin comentarios)
+        datos_csv = [
+            linea for linea in bytes(blob).decode('utf-8', errors='ignore').splitlines()
+            if ',' in linea and not linea.startswith('#')
+        ]
+
         if datos_csv:
             print(f"✅ Captura completada: {len(datos_csv)} líneas")
             return datos_csv
@@ -203,25 +218,54 @@ class ArduinoFlespiMQTT:
             return None
     
     def convertir_csv_a_array(self, datos_csv):
-        """Convierte las líneas CSV en un array de valores"""
-        valores = []
-        for linea in datos_csv:
-            fila = [int(val.strip()) for val in linea.split(',') if val.strip()]
-            valores.extend(fila)
-        return valores
+        """
+        Convierte las líneas CSV en un array NumPy plano de píxeles uint8
+
+        Devuelve una vista sobre el buffer preasignado de la instancia: el
+        contenido se sobreescribe en la siguiente captura, no hay que
+        retener la referencia entre frames.
+        """
+        # Parsear todo el frame de una sola vez en C (sin bucles Python por píxel).
+        # uint8 basta para escala de grises 0-255 y ocupa 1 byte por píxel.
+        # Las comas se convierten en espacios porque el separador por
+        # espacios colapsa repeticiones: las celdas vacías (p. ej. la coma
+        # final de cada línea del Arduino) se saltan igual que antes.
+        buf = " ".join(datos_csv).replace(",", " ")
+        try:
+            arr = np.fromstring(buf, sep=" ", dtype=np.uint8)
+        except ValueError as e:
+            print(f"❌ Error parseando CSV: {e}")
+            return None
+
+        if arr.size > self._frame.size:
+            self._frame = np.empty(arr.size, dtype=np.uint8)
+
+        self._frame[:arr.size] = arr
+        return self._frame[:arr.size]
     
-    def generar_anomalia(self, datos_imagen):
+    def _compute_stats(self, datos_imagen):
+        """
+        Calcula las estadísticas de brillo en una sola pasada sobre el frame.
+
+        Returns:
+            Tupla (promedio, mínimo, máximo) o None si no hay datos
+        """
+        if datos_imagen is None or datos_imagen.size == 0:
+            return None
+
+        brillo_min, brillo_max, suma = _stats_kernel(datos_imagen)
+        return (int(suma) / datos_imagen.size, int(brillo_min), int(brillo_max))
+
+    def generar_anomalia(self, stats):
         """
         Determina si hay humo basándose en el análisis estadístico de la imagen.
         Evalúa brillo promedio y rango dinámico (contraste).
         """
-        if not datos_imagen:
+        if stats is None:
             return "normal"
 
-        brillo_promedio = sum(datos_imagen) / len(datos_imagen)
-        brillo_min = min(datos_imagen)
-        brillo_max = max(datos_imagen)
-        rango = brillo_max - brillo_min  
+        brillo_promedio, brillo_min, brillo_max = stats
+        rango = brillo_max - brillo_min
         if brillo_promedio < 60 and rango < 25:
             return "humo"
         elif brillo_promedio < 80 and rango < 20:
@@ -229,8 +273,8 @@ class ArduinoFlespiMQTT:
         else:
             return "normal"
 
-    def enviar_a_flespi(self, datos_imagen, anomalia):
-        """Envía los datos a Flespi vía MQTT"""
+    def enviar_a_flespi(self, datos_imagen, stats, anomalia):
+        """Encola los datos y publica el lote a Flespi vía MQTT al completarse"""
         if not self.is_connected_mqtt:
             print("❌ No conectado a MQTT")
             self.errores += 1
@@ -239,57 +283,120 @@ class ArduinoFlespiMQTT:
         timestamp = int(time.time())
         
         # Crear payload JSON
+        # En estado normal basta un histograma de 256 niveles (512 bytes)
+        # para la analítica de umbrales aguas abajo: la detección ya ocurrió
+        # localmente. El frame completo solo viaja cuando hay anomalía.
+        if anomalia == "normal":
+            # uint32: con frames QVGA (_MAX_PIXELS) un bin puede superar
+            # 65535 y uint16 lo truncaría en silencio
+            arr_envio = np.bincount(datos_imagen, minlength=256).astype(np.uint32)
+            modo = "hist"
+        else:
+            arr_envio = datos_imagen
+            modo = "raw"
+
+        # Imagen como binario comprimido en lugar de lista JSON de enteros:
+        # zlib nivel 1 (rápido) + base64. El consumidor la recupera con
+        # np.frombuffer(zlib.decompress(base64.b64decode(...)), dtype=dtype)
+        # La hora legible se deriva del campo ts en el consumidor; aquí solo
+        # se formatea para la consola.
         payload = {
             "ts": timestamp,
             "anomalia": anomalia,
-            "imagen_datos": datos_imagen,
-            "total_pixeles": len(datos_imagen),
-            "timestamp_legible": datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+            "mode": modo,
+            "imagen_b64": base64.b64encode(
+                zlib.compress(arr_envio.tobytes(), 1)
+            ).decode(),
+            "dtype": str(arr_envio.dtype),
+            "shape": list(arr_envio.shape),
+            "total_pixeles": int(datos_imagen.size)
         }
+
+        # Agregar estadísticas de la imagen (ya calculadas, sin pasadas extra)
+        if stats is not None:
+            brillo_promedio, brillo_min, brillo_max = stats
+            payload["brillo_promedio"] = round(brillo_promedio, 2)
+            payload["brillo_minimo"] = brillo_min
+            payload["brillo_maximo"] = brillo_max
         
-        # Agregar estadísticas de la imagen
-        if datos_imagen:
-            payload["brillo_promedio"] = round(sum(datos_imagen) / len(datos_imagen), 2)
-            payload["brillo_minimo"] = min(datos_imagen)
-            payload["brillo_maximo"] = max(datos_imagen)
-        
-        print(f"\n📤 Enviando a Flespi MQTT...")
+        print(f"\n📤 Preparando envío a Flespi MQTT...")
         print(f"   Topic: {self.mqtt_topic}")
         print(f"   Anomalía: {anomalia.upper()}")
         print(f"   Píxeles: {len(datos_imagen)}")
-        print(f"   Timestamp: {payload['timestamp_legible']}")
-        
+        print(f"   Timestamp: {datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')}")
+
+        self._pending.append(payload)
+
+        # Publicar al completar el lote; una anomalía vacía el lote de inmediato
+        if len(self._pending) >= self.batch_size or anomalia == "humo":
+            return self._flush_pending()
+
+        print(f"📦 Lote: {len(self._pending)}/{self.batch_size} capturas en espera")
+        return True
+
+    def _flush_pending(self):
+        """Publica el lote de payloads pendientes en un solo mensaje MQTT"""
+        if not self._pending:
+            return True
+
+        lote = self._pending
+        self._pending = []
+
+        # Con lote de 1 se mantiene el formato original del mensaje
+        if len(lote) == 1:
+            mensaje_json = _dumps(lote[0])
+        else:
+            mensaje_json = _dumps({"batch": lote})
+
+        es_anomalia = any(payload["anomalia"] == "humo" for payload in lote)
+
+        # Encolar para el hilo publicador; si la cola está llena se
+        # descarta el mensaje más antiguo antes que frenar la captura
         try:
-            # Convertir a JSON
-            mensaje_json = json.dumps(payload)
-            
-            # Publicar en MQTT
-            result = self.mqtt_client.publish(
-                self.mqtt_topic,
-                mensaje_json,
-                qos=1
-            )
-            
-            if result.rc == mqtt.MQTT_ERR_SUCCESS:
-                print(f"✅ Enviado exitosamente a Flespi MQTT!")
-                self.total_envios += 1
-                
-                if anomalia == "humo":
-                    self.envios_humo += 1
-                    print("🔥 ALERTA: Anomalía detectada - HUMO")
-                else:
-                    self.envios_normal += 1
-                
-                return True
+            self._tx_q.put_nowait((mensaje_json, es_anomalia))
+        except queue.Full:
+            try:
+                self._tx_q.get_nowait()
+                self._tx_q.task_done()
+            except queue.Empty:
+                pass
+            self._tx_q.put_nowait((mensaje_json, es_anomalia))
+            self.errores += 1
+
+        print(f"✅ Encolado para Flespi MQTT ({len(lote)} captura(s))")
+
+        for payload in lote:
+            self.total_envios += 1
+            if payload["anomalia"] == "humo":
+                self.envios_humo += 1
+                print("🔥 ALERTA: Anomalía detectada - HUMO")
             else:
-                print(f"❌ Error al publicar MQTT. Código: {result.rc}")
+                self.envios_normal += 1
+
+        return True
+
+    def _publisher(self):
+        """Hilo que drena la cola de transmisión y publica en MQTT"""
+        while True:
+            mensaje_json, es_anomalia = self._tx_q.get()
+            try:
+                # Round-robin sobre el pool; las anomalías van siempre por
+                # el primer cliente para que lleguen en orden
+                cliente = self.mqtt_client if es_anomalia else next(self._rr)
+                result = cliente.publish(
+                    self.mqtt_topic,
+                    mensaje_json,
+                    qos=1
+                )
+
+                if result.rc != mqtt.MQTT_ERR_SUCCESS:
+                    print(f"❌ Error al publicar MQTT. Código: {result.rc}")
+                    self.errores += 1
+            except Exception as e:
+                print(f"❌ Error al enviar: {e}")
                 self.errores += 1
-                return False
-                
-        except Exception as e:
-            print(f"❌ Error al enviar: {e}")
-            self.errores += 1
-            return False
+            finally:
+                self._tx_q.task_done()
     
     def mostrar_estadisticas(self):
         """Muestra estadísticas de envíos"""
@@ -324,8 +431,8 @@ class ArduinoFlespiMQTT:
         
         try:
             contador = 0
+            deadline = time.monotonic()
             while True:
-                inicio = time.time()
                 contador += 1
                 
                 print(f"\n{'='*60}")
@@ -335,16 +442,18 @@ class ArduinoFlespiMQTT:
                 # Capturar datos del Arduino
                 datos_csv = self.capturar_datos_csv()
                 
-                if datos_csv:
-                    # Convertir a array
-                    datos_imagen = self.convertir_csv_a_array(datos_csv)
-                    
+                # Convertir a array (None si la captura o el parseo fallan)
+                datos_imagen = self.convertir_csv_a_array(datos_csv) if datos_csv else None
+
+                if datos_imagen is not None:
+                    # Estadísticas en una sola pasada, compartidas aguas abajo
+                    stats = self._compute_stats(datos_imagen)
+
                     # Determinar anomalía
-                    anomalia = self.generar_anomalia(datos_imagen)
+                    anomalia = self.generar_anomalia(stats)
 
-                    
                     # Enviar a Flespi
-                    self.enviar_a_flespi(datos_imagen, anomalia)
+                    self.enviar_a_flespi(datos_imagen, stats, anomalia)
                     
                     # Mostrar estadísticas cada 5 envíos
                     if self.total_envios % 5 == 0 and self.total_envios > 0:
@@ -353,13 +462,18 @@ class ArduinoFlespiMQTT:
                     print("⚠️  No se pudieron capturar datos, reintentando...")
                     self.errores += 1
                 
-                # Esperar hasta completar el intervalo
-                tiempo_transcurrido = time.time() - inicio
-                tiempo_espera = max(0, intervalo - tiempo_transcurrido)
-                
+                # Agenda con deadline absoluto sobre el reloj monotónico:
+                # la cadencia no deriva con lo que tarden captura/prints ni
+                # con ajustes NTP del reloj de pared
+                deadline += intervalo
+                tiempo_espera = deadline - time.monotonic()
+
                 if tiempo_espera > 0:
                     print(f"\n⏳ Esperando {tiempo_espera:.1f} segundos hasta próxima captura...")
                     time.sleep(tiempo_espera)
+                else:
+                    # Vamos atrasados: reanclar en lugar de acumular deuda
+                    deadline = time.monotonic()
         
         except KeyboardInterrupt:
             print("\n\n✋ Monitoreo detenido por el usuario")
@@ -367,14 +481,21 @@ class ArduinoFlespiMQTT:
     
     def cerrar(self):
         """Cierra las conexiones"""
-        if self.mqtt_client:
-            self.mqtt_client.loop_stop()
-            self.mqtt_client.disconnect()
-            print("🔌 Desconectado de MQTT")
+        # No perder capturas encoladas de un lote incompleto
+        if self._pending and self.is_connected_mqtt:
+            self._flush_pending()
+
+        # Esperar a que el hilo publicador vacíe la cola
+        if self.is_connected_mqtt:
+            self._tx_q.join()
+
+        for cliente in self.mqtt_clients:
+            cliente.loop_stop()
+            cliente.disconnect()
+        print("🔌 Desconectado de MQTT")
         
-        if self.serial_port and self.serial_port.is_open:
-            self.serial_port.close()
-            print("🔌 Conexión con Arduino cerrada")
+        self.cerrar_puerto()
+        print("🔌 Conexión con Arduino cerrada")
 
 
 def main():
@@ -3,85 +3,25 @@ Script de Python para capturar datos del Arduino Nano 33 BLE
 Lee datos del Serial y los muestra en consola
 """
 
-import serial
-import serial.tools.list_ports
 import time
-import csv
 from datetime import datetime
 
-class ArduinoSerialReader:
-    def __init__(self, baudrate=115200):
-        self.baudrate = baudrate
-        self.serial_port = None
-        self.is_connected = False
-        
-    def listar_puertos(self):
-        """Lista todos los puertos seriales disponibles"""
-        puertos = serial.tools.list_ports.comports()
-        print("\n" + "="*50)
-        print("PUERTOS SERIALES DISPONIBLES:")
-        print("="*50)
-        
-        if not puertos:
-            print("❌ No se encontraron puertos seriales")
-            return []
-        
-        for i, puerto in enumerate(puertos, 1):
-            print(f"{i}. {puerto.device} - {puerto.description}")
-        
-        return puertos
-    
-    def conectar(self, puerto=None):
-        """Conecta al puerto serial del Arduino"""
-        if puerto is None:
-            puertos = self.listar_puertos()
-            if not puertos:
-                return False
-            
-            try:
-                seleccion = int(input("\nSelecciona el número de puerto: ")) - 1
-                puerto = puertos[seleccion].device
-            except (ValueError, IndexError):
-                print("❌ Selección inválida")
-                return False
-        
-        try:
-            print(f"\n🔌 Conectando a {puerto}...")
-            self.serial_port = serial.Serial(puerto, self.baudrate, timeout=1)
-            time.sleep(2)  # Esperar a que se establezca la conexión
-            self.is_connected = True
-            print("✅ Conectado exitosamente!")
-            return True
-        except serial.SerialException as e:
-            print(f"❌ Error al conectar: {e}")
-            return False
-    
-    def leer_linea(self):
-        """Lee una línea del serial"""
-        if not self.is_connected:
-            return None
-        
-        try:
-            if self.serial_port.in_waiting > 0:
-                linea = self.serial_port.readline().decode('utf-8', errors='ignore').strip()
-                return linea
-        except Exception as e:
-            print(f"⚠️  Error al leer: {e}")
-        
-        return None
-    
+from serial_io import SerialIO, CSV_INICIO, CSV_FIN
+
+class ArduinoSerialReader(SerialIO):
+    """Lector interactivo de consola sobre la capa serial compartida"""
+
     def enviar_comando(self, comando):
         """Envía un comando al Arduino"""
         if not self.is_connected:
             print("❌ No conectado al Arduino")
-            return
-        
-        try:
-            self.serial_port.write(f"{comando}\n".encode())
+            return False
+
+        if super().enviar_comando(comando):
             print(f"📤 Comando enviado: {comando}")
-        except Exception as e:
-            print(f"❌ Error al enviar: {e}")
-    
+            return True
+        return False
+
     def leer_continuo(self):
         """Lee datos continuamente y los muestra en consola"""
         print("\n" + "="*50)
@@ -90,11 +30,11 @@ class ArduinoSerialReader:
         print("Presiona Ctrl+C para detener\n")
         
         try:
+            # leer_linea bloquea hasta que hay datos; sin sleep de sondeo
             while True:
                 linea = self.leer_linea()
                 if linea:
                     print(linea)
-                time.sleep(0.01)
         except KeyboardInterrupt:
             print("\n\n✋ Lectura detenida por el usuario")
     
@@ -107,40 +47,34 @@ class ArduinoSerialReader:
         print(f"\n📸 Capturando imagen en formato CSV...")
         print(f"📁 Archivo: {nombre_archivo}")
         
+        # Limpiar el buffer del SO en un solo syscall antes de capturar
+        self.serial_port.reset_input_buffer()
+
         # Enviar comando para captura ML
         self.enviar_comando('3')
-        time.sleep(0.5)
-        
-        datos_csv = []
-        capturando = False
-        
+
         print("\n⏳ Esperando datos...")
-        
+
+        datos_csv = []
         try:
-            while True:
-                linea = self.leer_linea()
-                
-                if linea:
-                    print(linea)  # Mostrar en consola
-                    
-                    # Detectar inicio de datos CSV
-                    if "INICIO DATOS CSV" in linea or "===" in linea:
-                        capturando = True
-                        continue
-                    
-                    # Detectar fin de datos CSV
-                    if "FIN DATOS CSV" in linea or "Copia estos datos" in linea:
-                        break
-                    
-                    # Capturar líneas con datos (contienen comas)
-                    if capturando and ',' in linea and not linea.startswith('#'):
-                        datos_csv.append(linea)
-                
-                time.sleep(0.01)
-        
+            # Lectura en bloque hasta el centinela de fin (ver SerialIO.read_until)
+            buf = self.read_until(CSV_FIN)
+
+            # Recortar el bloque CSV con los centinelas precompilados
+            m_inicio = CSV_INICIO.search(buf)
+            if m_inicio:
+                m_fin = CSV_FIN.search(buf, m_inicio.end())
+                blob = buf[m_inicio.end():m_fin.start() if m_fin else len(buf)]
+
+                # Solo las líneas de datos (con comas y sin comentarios)
+                datos_csv = [
+                    linea for linea in bytes(blob).decode('utf-8', errors='ignore').splitlines()
+                    if ',' in linea and not linea.startswith('#')
+                ]
+
         except KeyboardInterrupt:
             print("\n⚠️  Captura interrumpida")
-        
+
         # Guardar a archivo
         if datos_csv:
             with open(nombre_archivo, 'w', newline='') as f:
@@ -213,20 +147,18 @@ class ArduinoSerialReader:
         print("\n📨 Respuesta del Arduino:")
         print("-" * 50)
         
-        inicio = time.time()
-        while time.time() - inicio < timeout:
+        inicio = time.monotonic()
+        while time.monotonic() - inicio < timeout:
             linea = self.leer_linea()
             if linea:
                 print(linea)
-            time.sleep(0.01)
-        
+
         print("-" * 50)
     
     def cerrar(self):
         """Cierra la conexión serial"""
-        if self.serial_port and self.serial_port.is_open:
-            self.serial_port.close()
-            print("🔌 Conexión cerrada")
+        self.cerrar_puerto()
+        print("🔌 Conexión cerrada")
 
 
 def main():
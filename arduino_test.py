@@ -5,54 +5,72 @@ Versión simplificada - Solo conversión de archivos CSV
 
 import numpy as np
 from PIL import Image
-import csv
 import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
 
+@dataclass(slots=True)
 class CSVtoImageConverter:
-    def __init__(self, ancho=22, alto=18):
-        """
-        Inicializa el convertidor
-        
-        Args:
-            ancho: Ancho de la imagen (22 píxeles por default del Arduino)
-            alto: Alto de la imagen (18 píxeles por default del Arduino)
-        """
-        self.ancho = ancho
-        self.alto = alto
-        self.carpeta_salida = "imagenes_arduino"
-        
+    """
+    Convertidor de archivos CSV del Arduino a imágenes
+
+    Con slots los accesos a ancho/alto en el bucle de conversión son
+    cargas por offset en vez de búsquedas en __dict__.
+
+    Args:
+        ancho: Ancho de la imagen (22 píxeles por default del Arduino)
+        alto: Alto de la imagen (18 píxeles por default del Arduino)
+    """
+    ancho: int = 22
+    alto: int = 18
+    carpeta_salida: str = "imagenes_arduino"
+    _out_dir: str = field(init=False, default="")
+    _buf: object = field(init=False, default=None, repr=False)
+
+    def __post_init__(self):
         # Crear carpeta si no existe
         if not os.path.exists(self.carpeta_salida):
             os.makedirs(self.carpeta_salida)
             print(f"📁 Carpeta creada: {self.carpeta_salida}")
+
+        # Ruta absoluta resuelta una sola vez: guardar_imagen no vuelve a
+        # consultar el directorio por cada archivo
+        self._out_dir = os.path.abspath(self.carpeta_salida)
     
     def csv_a_array(self, archivo_csv):
         """
         Lee un archivo CSV y lo convierte en array numpy
-        
+
         Args:
             archivo_csv: Ruta al archivo CSV
-            
+
         Returns:
-            Array numpy con los valores de píxeles
+            Array numpy con los valores de píxeles. Es un buffer propio de
+            la instancia que se reutiliza entre conversiones del mismo
+            tamaño: la siguiente llamada lo sobreescribe.
         """
-        datos = []
-        
         try:
-            with open(archivo_csv, 'r') as f:
-                reader = csv.reader(f)
-                for linea in reader:
-                    # Saltar líneas vacías o comentarios
-                    if not linea or (linea[0].startswith('#')):
-                        continue
-                    
-                    # Convertir a enteros
-                    fila = [int(val) for val in linea if val.strip()]
-                    datos.extend(fila)
-            
-            return np.array(datos, dtype=np.uint8)
-        
+            # Parseo completo en C: una sola llamada en lugar de un bucle
+            # Python con int() por celda. Se filtran los comentarios y las
+            # comas se convierten en espacios: el separador por espacios
+            # colapsa repeticiones, así que las celdas vacías (comas
+            # finales) y las filas de distinta longitud se aceptan igual
+            # que en el tokenizador original.
+            with open(archivo_csv) as f:
+                lineas = [l for l in f.read().splitlines()
+                          if l.strip() and not l.lstrip().startswith('#')]
+            datos = np.fromstring(" ".join(lineas).replace(",", " "),
+                                  sep=" ", dtype=np.uint8)
+
+            # Buffer reutilizado: en lotes de frames del mismo tamaño se
+            # amortiza el malloc por archivo
+            if self._buf is None or self._buf.size != datos.size:
+                self._buf = np.empty(datos.size, dtype=np.uint8)
+
+            np.copyto(self._buf, datos)
+            return self._buf
+
         except Exception as e:
             print(f"❌ Error leyendo CSV: {e}")
             return None
@@ -74,29 +92,47 @@ class CSVtoImageConverter:
             
             if len(datos) != total_esperado:
                 print(f"⚠️  Ajustando dimensiones: {len(datos)} píxeles")
-                # Calcular nuevas dimensiones
+                # Calcular nuevas dimensiones: probar todos los altos
+                # candidatos de una vez con un módulo vectorizado
                 total_pixeles = len(datos)
-                # Intentar encontrar dimensiones que funcionen
-                for h in range(10, 50):
-                    if total_pixeles % h == 0:
-                        w = total_pixeles // h
-                        self.ancho = w
-                        self.alto = h
-                        print(f"   Nuevo tamaño: {w}x{h}")
-                        break
+                alturas = np.arange(10, 50)
+                validas = alturas[total_pixeles % alturas == 0]
+                if validas.size:
+                    h = int(validas[0])
+                    w = total_pixeles // h
+                    self.ancho = w
+                    self.alto = h
+                    print(f"   Nuevo tamaño: {w}x{h}")
             
-            # Reshape a matriz 2D
+            # Reshape a matriz 2D. Sobre un buffer C-contiguo de uint8 el
+            # reshape es solo un cambio de shape/strides (vista, sin copia)
+            # y Image.fromarray no necesita convertir nada; solo se copia
+            # si el array llegó no contiguo (p. ej. tras un transpose).
+            if not datos.flags['C_CONTIGUOUS']:
+                datos = np.ascontiguousarray(datos)
+            if datos.dtype != np.uint8:
+                datos = datos.astype(np.uint8)
+
             imagen_array = datos.reshape((self.alto, self.ancho))
-            
-            # Crear imagen en escala de grises
+
+            # Escalar para mejor visualización. Con factor entero el vecino
+            # más cercano equivale a replicar bloques, y np.repeat lo hace
+            # dentro del núcleo C de NumPy sin pasar por el resample de PIL.
+            if isinstance(escalar, int) and escalar > 1:
+                imagen_array = np.repeat(
+                    np.repeat(imagen_array, escalar, axis=0), escalar, axis=1
+                )
+
+            # Crear imagen en escala de grises. La imagen comparte buffer
+            # con el array: no mutar `datos` después de esta llamada.
             imagen = Image.fromarray(imagen_array, mode='L')
-            
-            # Escalar para mejor visualización
-            if escalar > 1:
-                nuevo_ancho = self.ancho * escalar
-                nuevo_alto = self.alto * escalar
+
+            # Factores no enteros: caer al resize de PIL
+            if not isinstance(escalar, int) and escalar > 1:
+                nuevo_ancho = int(self.ancho * escalar)
+                nuevo_alto = int(self.alto * escalar)
                 imagen = imagen.resize((nuevo_ancho, nuevo_alto), Image.NEAREST)
-            
+
             return imagen
         
         except Exception as e:
@@ -117,7 +153,7 @@ class CSVtoImageConverter:
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         extension = 'png' if formato == 'PNG' else 'jpg'
-        nombre_archivo = f"{self.carpeta_salida}/{nombre_base}_{timestamp}.{extension}"
+        nombre_archivo = f"{self._out_dir}/{nombre_base}_{timestamp}.{extension}"
         
         try:
             if formato == 'JPEG':
@@ -163,9 +199,38 @@ class CSVtoImageConverter:
         # Guardar
         nombre_base = os.path.splitext(os.path.basename(archivo_csv))[0]
         archivo_salida = self.guardar_imagen(imagen, nombre_base, formato)
-        
+
         return archivo_salida
 
+    def convertir_lote(self, archivos, escalar=10, formato='PNG'):
+        """
+        Convierte varios archivos CSV en paralelo, un proceso por núcleo
+
+        Los archivos son independientes entre sí, así que el lote se
+        reparte entre procesos worker y no pasa por el GIL.
+
+        Args:
+            archivos: Lista de rutas a archivos CSV
+            escalar: Factor de escalado
+            formato: 'PNG' o 'JPEG'
+
+        Returns:
+            Lista de rutas generadas (None en los archivos que fallaron)
+        """
+        tareas = [(archivo, self.ancho, self.alto, self.carpeta_salida,
+                   escalar, formato)
+                  for archivo in archivos]
+
+        with ProcessPoolExecutor() as executor:
+            return list(executor.map(_convertir_archivo, tareas))
+
+
+def _convertir_archivo(tarea):
+    """Convierte un archivo en un proceso worker (top-level para pickle)"""
+    archivo, ancho, alto, carpeta_salida, escalar, formato = tarea
+    convertidor = CSVtoImageConverter(ancho, alto, carpeta_salida)
+    return convertidor.convertir_csv_a_imagen(archivo, escalar, formato)
+
 
 def main():
     print("╔════════════════════════════════════════════════════════╗")
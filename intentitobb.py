@@ -1,9 +1,23 @@
 import paho.mqtt.client as mqtt
 import json
+import sys
 import time
-import random
 import math
-from datetime import datetime
+import threading
+import numpy as np
+from queue import SimpleQueue
+
+# Serializador JSON: orjson (implementado en C) cuando está instalado,
+# stdlib como respaldo. Ambos devuelven bytes, que paho publica tal cual.
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj)
+
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode()
 
 # --- CONFIGURACIÓN FLESPI MQTT ---
 MQTT_SERVER = "mqtt.flespi.io"
@@ -39,6 +53,103 @@ prev_lon = base_lon
 # Cliente MQTT
 mqtt_client = None
 connected = False
+connected_event = threading.Event()
+
+# Cola de salida: el bucle principal solo encola payloads; un hilo
+# consumidor (_flusher) los publica sin frenar al productor
+_tx_q = SimpleQueue()
+
+# Intensidad solar base por hora, precalculada en import: la hora solo
+# toma 24 valores, así que una carga de tabla reemplaza el sin() por tick
+# (y usa math.pi en lugar del 3.14159 a mano)
+_SOLAR_LUT = [
+    50000.0 * math.sin((h - 6) * math.pi / 12.0) if 6 <= h <= 18 else 0.0
+    for h in range(24)
+]
+
+# Reloj cacheado: el timestamp formateado y la hora solo cambian una vez
+# por segundo, no hace falta un strftime por publicación
+_last_sec = 0
+_last_ts_str = ""
+_last_hour = 0
+
+def _reloj():
+    """Devuelve (timestamp ISO, hora) recalculados solo al cambiar el segundo"""
+    global _last_sec, _last_ts_str, _last_hour
+    ahora = int(time.time())
+    if ahora != _last_sec:
+        t = time.localtime(ahora)
+        _last_ts_str = time.strftime("%Y-%m-%dT%H:%M:%SZ", t)
+        _last_hour = t.tm_hour
+        _last_sec = ahora
+    return _last_ts_str, _last_hour
+
+# RNG vectorizado: generar los aleatorios en bloques de 4096 con PCG64
+# amortiza el costo por muestra frente a un random.randint por llamada
+_rng = np.random.default_rng()
+
+class RandPool:
+    """Pool de enteros aleatorios pregenerados para un rango fijo"""
+
+    def __init__(self, lo, hi, n=4096):
+        self.lo = lo
+        self.hi = hi
+        self.n = n
+        self._refill()
+
+    def _refill(self):
+        self.buf = _rng.integers(self.lo, self.hi + 1, size=self.n, dtype=np.int32)
+        self.i = 0
+
+    def next(self):
+        if self.i >= self.n:
+            self._refill()
+        val = int(self.buf[self.i])
+        self.i += 1
+        return val
+
+# Un pool por rango usado en el simulador
+_pool_jitter = RandPool(-100, 100)      # movimiento lat/lon
+_pool_ajuste = RandPool(-50, 50)        # altitud y reanclaje GPS
+_pool_pct = RandPool(0, 100)            # probabilidades y luz nocturna
+_pool_humedad = RandPool(0, 400)
+_pool_temp = RandPool(0, 150)
+_pool_temp_anom = RandPool(50, 200)
+_pool_alt_anom = RandPool(-500, -100)
+_pool_solar = RandPool(-5000, 5000)
+_pool_tipo_anom = RandPool(1, 3, 512)
+
+# Núcleos de cálculo: con Numba instalado se compilan a código nativo vía
+# LLVM; sin Numba el decorador se vuelve un no-op y corren en Python puro.
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        def decorador(func):
+            return func
+        return decorador
+
+@njit(cache=True, fastmath=True)
+def _speed(cur_lat, cur_lon, prev_lat, prev_lon):
+    """Distancia recorrida entre dos posiciones GPS consecutivas (m)"""
+    lat_diff = (cur_lat - prev_lat) * 111139.0
+    lon_diff = (cur_lon - prev_lon) * 111139.0
+    # hypot: una sola llamada a libm, sin desborde en los cuadrados
+    return math.hypot(lat_diff, lon_diff)
+
+@njit(cache=True, fastmath=True)
+def _mover(lat, lon, alt_base, lat_base, lon_base, j_lat, j_lon, j_alt, r_lat, r_lon):
+    """Aplica el paso de movimiento y mantiene el dron dentro de límites"""
+    lat += j_lat / 1000000.0
+    lon += j_lon / 1000000.0
+    alt = alt_base + j_alt / 10.0
+
+    if abs(lat - lat_base) > 0.005:
+        lat = lat_base + r_lat / 10000.0
+    if abs(lon - lon_base) > 0.005:
+        lon = lon_base + r_lon / 10000.0
+
+    return lat, lon, alt
 
 def on_connect(client, userdata, flags, rc):
     """Callback cuando se conecta al broker MQTT"""
@@ -48,6 +159,7 @@ def on_connect(client, userdata, flags, rc):
         print(f"Cliente: {CLIENT_ID}")
         print(f"Tópico: {MQTT_TOPIC}\n")
         connected = True
+        connected_event.set()
     else:
         print(f"✗ Error de conexión. Código: {rc}")
         connected = False
@@ -56,6 +168,7 @@ def on_disconnect(client, userdata, rc):
     """Callback cuando se desconecta del broker"""
     global connected
     connected = False
+    connected_event.clear()
     if rc != 0:
         print(f"⚠ Desconexión inesperada. Código: {rc}")
 
@@ -75,42 +188,44 @@ def calculate_covered_area():
     area_m2 = distance_km * 1000.0 * 10.0
     return area_m2
 
+# Clasificación de fumigación sin saltos: los cuatro predicados se
+# empaquetan en un código de 4 bits que indexa esta tabla precalculada
+# (la temperatura tiene prioridad, igual que en la versión con ifs)
+_SPRAY = tuple(
+    "NO_APTO_TEMP" if (c & 3) else "NO_APTO_HUMEDAD" if (c & 12) else "APTO"
+    for c in range(16)
+)
+
 def evaluate_spray_conditions(temp, humidity):
     """Función 3: Evaluar condiciones ambientales para fumigación"""
-    if temp < 10 or temp > 35:
-        return "NO_APTO_TEMP"
-    if humidity < 30 or humidity > 90:
-        return "NO_APTO_HUMEDAD"
-    return "APTO"
+    return _SPRAY[(temp < 10) | ((temp > 35) << 1)
+                  | ((humidity < 30) << 2) | ((humidity > 90) << 3)]
 
 def calculate_drone_speed():
     """Función 4: Calcular velocidad del dron (m/s)"""
     global prev_lat, prev_lon
-    
-    lat_diff = (current_lat - prev_lat) * 111139.0
-    lon_diff = (current_lon - prev_lon) * 111139.0
-    distance = math.sqrt(lat_diff * lat_diff + lon_diff * lon_diff)
-    
+
+    distance = _speed(current_lat, current_lon, prev_lat, prev_lon)
+
     prev_lat = current_lat
     prev_lon = current_lon
-    
+
     return distance
 
 def get_solar_intensity():
     """Función 5: Simular intensidad de luz solar según hora del día (lux)"""
-    hours = datetime.now().hour
-    
+    hours = _reloj()[1]
+
     if 6 <= hours <= 18:
         # Día: 6 AM a 6 PM
-        hour_factor = math.sin((hours - 6) * 3.14159 / 12.0)
-        return 50000.0 * hour_factor + random.randint(-5000, 5000)
+        return _SOLAR_LUT[hours] + _pool_solar.next()
     else:
         # Noche
-        return random.randint(0, 100)
+        return _pool_pct.next()
 
 def detect_rain_condition(humidity):
     """Función 6: Detectar probabilidad de lluvia y retornar estado"""
-    rain_prob = random.randint(0, 100)
+    rain_prob = _pool_pct.next()
     
     if humidity > 80 and rain_prob > 70:
         return "LLUVIA_DETECTADA"
@@ -122,16 +237,37 @@ def detect_rain_condition(humidity):
 def simulate_drone_movement():
     """Simular movimiento del dron"""
     global current_lat, current_lon, current_alt
-    
-    current_lat += random.randint(-100, 100) / 1000000.0
-    current_lon += random.randint(-100, 100) / 1000000.0
-    current_alt = base_alt + random.randint(-50, 50) / 10.0
-    
-    # Mantener dentro de límites
-    if abs(current_lat - base_lat) > 0.005:
-        current_lat = base_lat + random.randint(-50, 50) / 10000.0
-    if abs(current_lon - base_lon) > 0.005:
-        current_lon = base_lon + random.randint(-50, 50) / 10000.0
+
+    current_lat, current_lon, current_alt = _mover(
+        current_lat, current_lon, base_alt, base_lat, base_lon,
+        _pool_jitter.next(), _pool_jitter.next(),
+        _pool_ajuste.next(),
+        _pool_ajuste.next(), _pool_ajuste.next()
+    )
+
+# ===== TABLA DE CASOS DE ANOMALÍA =====
+# Cada caso produce (temperatura, altitud, gps, mensaje) de una sola vez
+
+def _caso_normal():
+    return (25.0 + _pool_temp.next() / 10.0, current_alt,
+            {"lat": current_lat, "lon": current_lon}, None)
+
+def _caso_temp():
+    return (45.0 + _pool_temp_anom.next() / 10.0, current_alt,
+            {"lat": current_lat, "lon": current_lon},
+            "🔥 ANOMALÍA: Temperatura crítica!")
+
+def _caso_gps():
+    return (25.0 + _pool_temp.next() / 10.0, current_alt,
+            {"lat": None, "lon": None},
+            "📡 ANOMALÍA: Pérdida de señal GPS!")
+
+def _caso_alt():
+    return (25.0 + _pool_temp.next() / 10.0, _pool_alt_anom.next() / 10.0,
+            {"lat": current_lat, "lon": current_lon},
+            "⬇  ANOMALÍA: Altitud negativa - CAÍDA!")
+
+_ANOMALY_HANDLERS = {0: _caso_normal, 1: _caso_temp, 2: _caso_gps, 3: _caso_alt}
 
 def publish_telemetry():
     """Publicar telemetría al servidor MQTT"""
@@ -146,7 +282,7 @@ def publish_telemetry():
     anomaly_type = 0
     
     if has_anomaly:
-        anomaly_type = random.randint(1, 3)
+        anomaly_type = _pool_tipo_anom.next()
     
     # Simular movimiento o pérdida GPS
     if anomaly_type != 2:
@@ -159,89 +295,92 @@ def publish_telemetry():
     if battery_level < 0:
         battery_level = 100.0
     
-    # Crear timestamp
-    timestamp = datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
-    
-    # Temperatura con posible anomalía
-    if anomaly_type == 1:
-        temperature = 45.0 + random.randint(50, 200) / 10.0
-        print("🔥 ANOMALÍA: Temperatura crítica!")
-    else:
-        temperature = 25.0 + random.randint(0, 150) / 10.0
-    
-    humidity = 40.0 + random.randint(0, 400) / 10.0
-    
-    # Altitud con posible anomalía
-    if anomaly_type == 3:
-        altitude = random.randint(-500, -100) / 10.0
-        print("⬇  ANOMALÍA: Altitud negativa - CAÍDA!")
-    else:
-        altitude = current_alt
+    # Crear timestamp (cacheado por segundo)
+    timestamp = _reloj()[0]
     
+    # Despacho por tabla: un solo lookup produce (temperatura, altitud,
+    # gps, mensaje) en lugar de re-evaluar anomaly_type campo por campo
+    temperature, altitude, gps, msg_anomalia = _ANOMALY_HANDLERS[anomaly_type]()
+    if msg_anomalia:
+        print(msg_anomalia)
+
+    humidity = 40.0 + _pool_humedad.next() / 10.0
+
     # Crear payload JSON
     data = {
         "timestamp": timestamp,
         "temperature": round(temperature, 1),
         "humidity": round(humidity, 1),
         "altitude": round(altitude, 1),
-        "battery": int(battery_level)
+        "battery": int(battery_level),
+        "gps": gps
     }
-    
-    # GPS con posible anomalía
+
+    # Encolar para el hilo publicador: el bucle de telemetría no espera
+    # al publish() de paho ni a su lock interno
+    json_bytes = _dumps(data)
+    _tx_q.put(json_bytes)
+
+    # Consolidar la salida en un solo write: un syscall por lectura en
+    # lugar de ~10 prints que toman el lock de stdout cada uno
+    lineas = []
+    if has_anomaly:
+        lineas.append(f"⚠  LECTURA #{reading_count} - CON ANOMALÍA")
+    else:
+        lineas.append(f"✓ Lectura #{reading_count} - Normal")
+
     if anomaly_type == 2:
-        data["gps"] = {"lat": None, "lon": None}
-        print("📡 ANOMALÍA: Pérdida de señal GPS!")
+        lineas.append("  📍 GPS: NULL (sin señal)")
     else:
-        data["gps"] = {"lat": current_lat, "lon": current_lon}
-    
-    # Publicar a MQTT
-    try:
-        json_str = json.dumps(data)
-        result = mqtt_client.publish(MQTT_TOPIC, json_str, qos=0)
-        
-        if result.rc == mqtt.MQTT_ERR_SUCCESS:
-            # Mostrar información
-            if has_anomaly:
-                print(f"⚠  LECTURA #{reading_count} - CON ANOMALÍA")
-            else:
-                print(f"✓ Lectura #{reading_count} - Normal")
-            
-            print(f"  📍 GPS: ", end="")
-            if anomaly_type == 2:
-                print("NULL (sin señal)")
-            else:
-                print(f"{current_lat:.6f}, {current_lon:.6f}")
-            
-            print(f"  🌡  Temp: {temperature:.1f}°C")
-            print(f"  📏 Alt: {altitude:.1f}m")
-            print(f"  🔋 Batería: {int(battery_level)}% (Autonomía: {calculate_remaining_autonomy():.0f} min)")
-            
-            # Mostrar datos de luz solar y lluvia
-            solar = get_solar_intensity()
-            rain = detect_rain_condition(humidity)
-            
-            print(f"  ☀  Luz solar: {solar:.0f} lux")
-            print(f"  🌧  Estado lluvia: {rain}")
-            print(f"  📊 JSON: {json_str}")
-            
-            # Estadísticas cada 5 lecturas
-            if reading_count % 5 == 0:
-                print("\n--- ESTADÍSTICAS DE VUELO ---")
-                print(f"⏱  Tiempo de vuelo: {flight_time/60.0:.1f} min")
-                print(f"📐 Área cubierta: {calculate_covered_area():.0f} m²")
-                print(f"💨 Velocidad: {calculate_drone_speed():.2f} m/s")
-                print(f"🌿 Condiciones fumigación: {evaluate_spray_conditions(temperature, humidity)}")
-                print(f"📡 Pérdidas GPS totales: {gps_loss_count}")
-                print(f"☀  Intensidad solar: {solar:.0f} lux")
-                print(f"🌧  Condición climática: {rain}")
-                print("-----------------------------\n")
-            
-            print()
-        else:
-            print(f"✗ Error al publicar. Código: {result.rc}")
-            
-    except Exception as e:
-        print(f"✗ Error al publicar: {e}")
+        lineas.append(f"  📍 GPS: {current_lat:.6f}, {current_lon:.6f}")
+
+    lineas.append(f"  🌡  Temp: {temperature:.1f}°C")
+    lineas.append(f"  📏 Alt: {altitude:.1f}m")
+    lineas.append(f"  🔋 Batería: {int(battery_level)}% (Autonomía: {calculate_remaining_autonomy():.0f} min)")
+
+    # Datos de luz solar y lluvia
+    solar = get_solar_intensity()
+    rain = detect_rain_condition(humidity)
+
+    lineas.append(f"  ☀  Luz solar: {solar:.0f} lux")
+    lineas.append(f"  🌧  Estado lluvia: {rain}")
+    lineas.append(f"  📊 JSON: {json_bytes.decode()}")
+
+    # Estadísticas cada 5 lecturas
+    if reading_count % 5 == 0:
+        lineas.append("\n--- ESTADÍSTICAS DE VUELO ---")
+        lineas.append(f"⏱  Tiempo de vuelo: {flight_time/60.0:.1f} min")
+        lineas.append(f"📐 Área cubierta: {calculate_covered_area():.0f} m²")
+        lineas.append(f"💨 Velocidad: {calculate_drone_speed():.2f} m/s")
+        lineas.append(f"🌿 Condiciones fumigación: {evaluate_spray_conditions(temperature, humidity)}")
+        lineas.append(f"📡 Pérdidas GPS totales: {gps_loss_count}")
+        lineas.append(f"☀  Intensidad solar: {solar:.0f} lux")
+        lineas.append(f"🌧  Condición climática: {rain}")
+        lineas.append("-----------------------------\n")
+
+    lineas.append("")
+    sys.stdout.write("\n".join(lineas) + "\n")
+
+    # Vaciar el buffer de stdout solo de vez en cuando
+    if reading_count % 5 == 0:
+        sys.stdout.flush()
+
+def _flusher():
+    """Hilo consumidor: drena la cola de salida y publica en lotes"""
+    while True:
+        lote = [_tx_q.get()]
+
+        # Arrastrar lo que ya esté encolado, hasta 64 por pasada
+        while len(lote) < 64 and not _tx_q.empty():
+            lote.append(_tx_q.get())
+
+        for json_bytes in lote:
+            try:
+                result = mqtt_client.publish(MQTT_TOPIC, json_bytes, qos=0)
+                if result.rc != mqtt.MQTT_ERR_SUCCESS:
+                    print(f"✗ Error al publicar. Código: {result.rc}")
+            except Exception as e:
+                print(f"✗ Error al publicar: {e}")
 
 def main():
     """Función principal"""
@@ -265,26 +404,35 @@ def main():
         mqtt_client.connect(MQTT_SERVER, MQTT_PORT, keepalive=60)
         mqtt_client.loop_start()
         
-        # Esperar conexión
-        timeout = 10
-        while not connected and timeout > 0:
-            time.sleep(0.5)
-            timeout -= 0.5
-        
+        # Esperar conexión: el Event se dispara desde on_connect, sin
+        # dormir en pasos de 500 ms
+        connected_event.wait(timeout=10)
+
         if not connected:
             print("⚠ No se pudo conectar a MQTT")
             return
         
         print("="*40)
         print("\nIniciando publicación de telemetría...\n")
+
+        # Hilo publicador que drena la cola de salida
+        threading.Thread(target=_flusher, daemon=True).start()
         
-        # Loop principal
+        # Loop principal con deadline monotónico: la cadencia de 1 Hz no
+        # deriva con lo que tarde publish_telemetry, y flight_time mide
+        # el tiempo real transcurrido en lugar de contar iteraciones
+        start_time = time.monotonic()
+        next_tick = start_time
         while True:
             try:
+                next_tick += 1.0
                 publish_telemetry()
-                flight_time += 1.0
-                time.sleep(1)  # Publicar cada 1 segundo
-                
+                flight_time = time.monotonic() - start_time
+
+                sleep_for = next_tick - time.monotonic()
+                if sleep_for > 0:
+                    time.sleep(sleep_for)
+
             except KeyboardInterrupt:
                 print("\n\n⚠ Deteniendo AgroDrone...")
                 mqtt_client.loop_stop()
@@ -0,0 +1,158 @@
+"""
+Capa común de E/S serial para los scripts del proyecto
+Concentra la apertura del puerto, la lectura en bloque y el envío de
+comandos para que las optimizaciones se apliquen en un solo lugar
+"""
+
+import re
+import time
+import serial
+import serial.tools.list_ports
+
+# Centinelas del protocolo de captura CSV del Arduino, precompilados
+# para buscar directamente sobre bytes
+CSV_INICIO = re.compile(rb"INICIO DATOS CSV|===")
+CSV_FIN = re.compile(rb"FIN DATOS CSV|Copia estos datos")
+
+
+class SerialIO:
+    """Base con el manejo del puerto serial compartido por los scripts"""
+
+    def __init__(self, baudrate=115200):
+        self.baudrate = baudrate
+        self.serial_port = None
+        self.is_connected = False
+
+        # Buffer de lectura reutilizado entre capturas
+        self._buf = bytearray()
+
+    def listar_puertos(self):
+        """Lista todos los puertos seriales disponibles"""
+        puertos = serial.tools.list_ports.comports()
+        print("\n" + "="*50)
+        print("PUERTOS SERIALES DISPONIBLES:")
+        print("="*50)
+
+        if not puertos:
+            print("❌ No se encontraron puertos seriales")
+            return []
+
+        for i, puerto in enumerate(puertos, 1):
+            print(f"{i}. {puerto.device} - {puerto.description}")
+
+        return puertos
+
+    def conectar(self, puerto=None):
+        """
+        Conecta al puerto serial del Arduino
+
+        Activa el modo de baja latencia del adaptador USB-serial cuando el
+        sistema lo soporta (en Linux fija ASYNC_LOW_LATENCY vía ioctl, en
+        Windows pyserial lo mapea al registro del driver FTDI), evitando el
+        timer de ~16 ms que el driver aplica por defecto a cada lectura.
+        """
+        if puerto is None:
+            puertos = self.listar_puertos()
+            if not puertos:
+                return False
+
+            try:
+                seleccion = int(input("\nSelecciona el número de puerto: ")) - 1
+                puerto = puertos[seleccion].device
+            except (ValueError, IndexError):
+                print("❌ Selección inválida")
+                return False
+
+        try:
+            print(f"\n🔌 Conectando a {puerto}...")
+            self.serial_port = serial.Serial(puerto, self.baudrate, timeout=1)
+
+            # Baja latencia: no disponible en todas las plataformas/drivers
+            try:
+                self.serial_port.set_low_latency_mode(True)
+            except Exception:
+                pass
+
+            time.sleep(2)  # Esperar a que se establezca la conexión
+
+            # Timeouts cortos: las lecturas se hacen en bloque, no conviene
+            # bloquear 1 s esperando bytes que ya llegaron
+            self.serial_port.timeout = 0.01
+            self.serial_port.write_timeout = 0.1
+
+            self.is_connected = True
+            print("✅ Conectado exitosamente!")
+            return True
+        except serial.SerialException as e:
+            print(f"❌ Error al conectar: {e}")
+            return False
+
+    def leer_linea(self):
+        """
+        Lee una línea del serial
+
+        readline() bloquea en el kernel hasta que llegan datos o vence el
+        timeout corto del puerto, así que los bucles que la llaman no
+        necesitan dormir entre intentos (sin sondeo de in_waiting).
+        """
+        if not self.is_connected:
+            return None
+
+        try:
+            linea = self.serial_port.readline().decode('utf-8', errors='ignore').strip()
+            return linea or None
+        except Exception as e:
+            print(f"⚠️  Error al leer: {e}")
+
+        return None
+
+    def enviar_comando(self, comando):
+        """Envía un comando al Arduino"""
+        if not self.is_connected:
+            return False
+
+        try:
+            self.serial_port.write(f"{comando}\n".encode())
+            return True
+        except Exception as e:
+            print(f"❌ Error al enviar comando: {e}")
+            return False
+
+    def read_until(self, patron_fin, timeout=10):
+        """
+        Lee del serial en bloque hasta ver el centinela de fin
+
+        Vacía todo lo disponible en el buffer del SO con un solo read()
+        por iteración en lugar de readline() + sleep por línea; read(1)
+        bloquea hasta el timeout corto cuando no hay datos.
+
+        Args:
+            patron_fin: Regex compilado (bytes) que marca el fin del bloque
+            timeout: Segundos máximos de espera total (default 10)
+
+        Returns:
+            bytearray con lo leído (reutilizado entre llamadas)
+        """
+        self.serial_port.timeout = 0.05
+        buf = self._buf
+        buf.clear()
+        fin = time.monotonic() + timeout
+
+        while time.monotonic() < fin:
+            chunk = self.serial_port.read(self.serial_port.in_waiting or 1)
+            if not chunk:
+                continue
+            buf += chunk
+
+            # Buscar el centinela de fin solo en la cola recién llegada
+            cola = buf[max(0, len(buf) - len(chunk) - 32):]
+            if patron_fin.search(cola):
+                break
+
+        return buf
+
+    def cerrar_puerto(self):
+        """Cierra la conexión serial"""
+        if self.serial_port and self.serial_port.is_open:
+            self.serial_port.close()
+        self.is_connected = False